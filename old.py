@@ -0,0 +1,1002 @@
+#!/usr/bin/env python3
+"""Generate stats for the profile README.
+
+Pulls repo metadata from the GitHub API, aggregates language bytes,
+counts lines of code in non-fork repos, renders two stat cards and
+splices them into README.md between the STATS markers.
+
+Needs GITHUB_TOKEN for a usable rate limit. Pass --push to commit the
+updated README and images.
+"""
+
+import asyncio
+import base64
+import hashlib
+import html
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import aiohttp
+import cairosvg
+import requests
+from requests.adapters import HTTPAdapter
+import matplotlib
+
+# Force the Agg backend before pyplot loads: these scripts run headless
+# in CI and backend auto-detection just burns import time.
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+from git import Repo  # noqa: E402
+
+# Selecting the style once at import avoids re-parsing the stylesheet in
+# every render call.
+plt.style.use("seaborn-v0_8")
+matplotlib.rcParams.update({
+    "text.usetex": False,
+    "path.simplify": True,
+    "path.simplify_threshold": 1.0,
+    "svg.fonttype": "path",
+    "figure.autolayout": False,
+})
+
+USERNAME = os.environ.get("GITHUB_USERNAME", "AustrianNoah")
+# GITHUB_TOKENS (comma-separated) spreads the fan-out across several
+# tokens' rate limits; it falls back to the single GITHUB_TOKEN. The
+# sync paths (and the authenticated-mode switch) use the first token.
+TOKENS = [
+    t.strip()
+    for t in os.environ.get("GITHUB_TOKENS", "").split(",")
+    if t.strip()
+]
+TOKEN = os.environ.get("GITHUB_TOKEN", "") or (TOKENS[0] if TOKENS else "")
+if not TOKENS and TOKEN:
+    TOKENS = [TOKEN]
+API = "https://api.github.com"
+GRAPHQL_URL = f"{API}/graphql"
+
+# Aliased blob lookups per GraphQL query; the API caps a query at 500 nodes.
+BLOB_BATCH = 200
+
+HEADERS = {"Accept": "application/vnd.github+json"}
+if TOKEN:
+    HEADERS["Authorization"] = f"Bearer {TOKEN}"
+
+# One pooled session for all blocking calls: keep-alive means we pay the
+# TCP+TLS handshake to api.github.com once, not once per request.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=64))
+
+CODE_EXTS = frozenset({
+    ".py", ".rs", ".js", ".ts", ".jsx", ".tsx", ".java", ".kt", ".go",
+    ".c", ".h", ".cpp", ".hpp", ".cs", ".rb", ".php", ".swift", ".sh",
+    ".html", ".css", ".scss", ".sql", ".toml", ".yml", ".yaml", ".json",
+})
+
+
+def _ext_of(path):
+    """Lowercased extension of *path*, '' for none or a bare dotfile.
+
+    A slice off rfind avoids the Path/splitext allocations in the
+    per-file hot loops.
+    """
+    dot = path.rfind(".")
+    if dot <= path.rfind("/") + 1:
+        return ""
+    return path[dot:].lower()
+
+MAX_CONCURRENCY = 16
+MAX_RETRIES = 3
+
+# Directories that contribute no useful LOC but dominate walk time.
+SKIP_DIRS = {".git", "node_modules", "vendor", "dist", "build"}
+
+# Files above this are almost always vendored/generated blobs; skip them.
+MAX_COUNT_BYTES = 50 * 1024 * 1024
+
+# Everything the run reads or writes is anchored to the repo root so
+# the script behaves the same from any working directory.
+REPO_ROOT = Path(__file__).resolve().parent
+
+# ETag cache: {url: {"etag": ..., "body": ...}}. A 304 revalidation does
+# not count against the rate limit, so steady-state runs are nearly free.
+CACHE_PATH = REPO_ROOT / ".stats-cache.json"
+
+README_PATH = REPO_ROOT / "README.md"
+STATS_START = "<!-- STATS:START -->"
+STATS_END = "<!-- STATS:END -->"
+STATS_RE = re.compile(
+    re.escape(STATS_START) + ".*?" + re.escape(STATS_END), re.DOTALL
+)
+
+LANGS_PNG = REPO_ROOT / "github_stats_langs.png"
+LANGS_SVG = REPO_ROOT / "github_stats_langs.svg"
+CARD_PNG = REPO_ROOT / "github_stats_card.png"
+CARD_SVG = REPO_ROOT / "github_stats_card.svg"
+
+
+def _load_cache():
+    try:
+        return json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+_CACHE = _load_cache()
+
+
+def _flush_cache():
+    CACHE_PATH.write_text(
+        json.dumps(_CACHE, separators=(",", ":")), encoding="utf-8"
+    )
+
+
+@lru_cache(maxsize=256)
+def _get_json(url):
+    """GET *url* at most once per process; returns the raw JSON text.
+
+    The LRU deduplicates identical calls within a single invocation
+    (several scripts driven by one runner hit /users/{login} each);
+    caching the text keeps the key hashable and the footprint bounded.
+    The ETag cache underneath still handles cross-run reuse.
+    """
+    entry = _CACHE.get(url)
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    r = SESSION.get(url, headers=headers, timeout=30)
+    if r.status_code == 304 and entry is not None:
+        return json.dumps(entry["body"], separators=(",", ":"))
+    r.raise_for_status()
+    etag = r.headers.get("ETag")
+    if etag:
+        _CACHE[url] = {"etag": etag, "body": r.json()}
+    return r.text
+
+
+def cached_get(url):
+    """GET *url* through the process-lifetime cache, parsed."""
+    return json.loads(_get_json(url))
+
+
+def fetch_user_info(username):
+    """Return the /users/{username} payload."""
+    return cached_get(f"{API}/users/{username}")
+
+
+class AdaptiveLimiter:
+    """Pace the async fan-out from GitHub's rate-limit headers.
+
+    Every response reports X-RateLimit-Remaining/Reset; once remaining
+    drops below the fan-out width, new acquisitions sleep until the
+    window resets instead of burning the tail of the run on 403s. A
+    secondary-limit response with Retry-After pauses all workers for the
+    advertised interval.
+    """
+
+    def __init__(self, concurrency=MAX_CONCURRENCY):
+        self._concurrency = concurrency
+        self._remaining = None
+        self._reset_at = 0.0
+        self._resume = asyncio.Event()
+        self._resume.set()
+
+    async def acquire(self):
+        await self._resume.wait()
+        if self._remaining is not None and self._remaining < self._concurrency:
+            delay = self._reset_at - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._remaining = None
+
+    def update(self, headers):
+        try:
+            self._remaining = int(headers["X-RateLimit-Remaining"])
+            self._reset_at = float(headers["X-RateLimit-Reset"])
+        except (KeyError, ValueError):
+            pass
+
+    def pause(self, seconds):
+        if self._resume.is_set():
+            self._resume.clear()
+            asyncio.get_running_loop().call_later(seconds, self._resume.set)
+
+    def budget(self):
+        """Remaining requests, or infinity before the first response."""
+        return self._remaining if self._remaining is not None else float("inf")
+
+
+class TokenPool:
+    """Spread the async fan-out across several tokens' rate limits.
+
+    Each token keeps its own AdaptiveLimiter and acquire() hands out the
+    one with the largest remaining budget, so the effective limit scales
+    with the pool size. With one (or no) token this degenerates to the
+    plain single-limiter behaviour.
+    """
+
+    def __init__(self, tokens):
+        self._limiters = (
+            [(t, AdaptiveLimiter()) for t in tokens] or [("", AdaptiveLimiter())]
+        )
+
+    async def acquire(self):
+        """Pick the most-budgeted token; returns (auth_headers, limiter)."""
+        token, limiter = max(self._limiters, key=lambda tl: tl[1].budget())
+        await limiter.acquire()
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        return headers, limiter
+
+
+POOL = TokenPool(TOKENS)
+
+
+# In-flight parameter-less GETs by URL; concurrent callers coalesce
+# into a single request instead of racing duplicates down the wire.
+_INFLIGHT = {}
+_INFLIGHT_LOCK = asyncio.Lock()
+
+
+async def fetch_json(session, url, params=None, with_links=False):
+    """GET a JSON payload, coalescing concurrent identical requests.
+
+    Parameter-less URLs share one in-flight task per URL; paginated or
+    link-aware calls go straight through.
+    """
+    if params is not None or with_links:
+        return await _request_json(session, url, params, with_links)
+    async with _INFLIGHT_LOCK:
+        task = _INFLIGHT.get(url)
+        if task is None:
+            task = asyncio.create_task(_request_json(session, url, None, False))
+            _INFLIGHT[url] = task
+            task.add_done_callback(lambda _t: _INFLIGHT.pop(url, None))
+    return await task
+
+
+async def _request_json(session, url, params=None, with_links=False):
+    """GET a JSON payload with retry + backoff and ETag revalidation.
+
+    Responses are only cached for parameter-less URLs, so paginated
+    endpoints never collide on the cache key. With with_links=True the
+    result is (body, links) so callers can read the pagination header.
+    """
+    # Blobs are sha-addressed and huge; persisting their bodies would
+    # balloon the cache file to the size of all counted code.
+    cacheable = params is None and "/git/blobs/" not in url
+    entry = _CACHE.get(url) if cacheable else None
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    for attempt in range(MAX_RETRIES):
+        try:
+            auth, limiter = await POOL.acquire()
+            async with session.get(
+                url, params=params, headers={**headers, **auth}
+            ) as resp:
+                limiter.update(resp.headers)
+                if resp.status == 304 and entry is not None:
+                    return (entry["body"], {}) if with_links else entry["body"]
+                if resp.status in (403, 429) or resp.status >= 500:
+                    retry_after = resp.headers.get("Retry-After", "")
+                    if retry_after.isdigit():
+                        limiter.pause(int(retry_after))
+                    raise aiohttp.ClientResponseError(
+                        resp.request_info, resp.history, status=resp.status
+                    )
+                resp.raise_for_status()
+                body = await resp.json()
+                etag = resp.headers.get("ETag")
+                if cacheable and etag:
+                    _CACHE[url] = {"etag": etag, "body": body}
+                return (body, resp.links) if with_links else body
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            status = getattr(e, "status", None)
+            if (
+                status is not None
+                and 400 <= status < 500
+                and status not in (403, 429)
+            ):
+                raise  # permanent (404, 401, ...); backing off won't help
+            if attempt == MAX_RETRIES - 1:
+                raise
+            await asyncio.sleep(2 ** attempt)
+
+
+async def fetch_repos(session, username):
+    """Return all public repos for *username* (100 per page).
+
+    Page 1 is fetched alone; its Link rel="last" header gives the total
+    page count, and pages 2..N then download concurrently. Without the
+    header there is only one page and nothing more to do.
+    """
+    url = f"{API}/users/{username}/repos"
+
+    def params_for(page):
+        return {"per_page": 100, "page": page, "sort": "pushed"}
+
+    repos, links = await fetch_json(
+        session, url, params=params_for(1), with_links=True
+    )
+    repos = list(repos)
+
+    last_page = 1
+    last_url = links.get("last", {}).get("url")
+    if last_url is not None:
+        try:
+            last_page = int(parse_qs(urlsplit(str(last_url)).query)["page"][0])
+        except (KeyError, ValueError):
+            last_page = 1
+    if last_page > 1:
+        batches = await asyncio.gather(
+            *(
+                fetch_json(session, url, params=params_for(p))
+                for p in range(2, last_page + 1)
+            )
+        )
+        for batch in batches:
+            repos.extend(batch)
+    return repos
+
+
+async def aggregate_language_bytes(session, repos):
+    """Fan out the per-repo language fetches and sum bytes per language."""
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+
+    async def fetch_languages(url):
+        async with sem:
+            return await fetch_json(session, url)
+
+    tasks = [
+        fetch_languages(r["languages_url"]) for r in repos if not r.get("fork")
+    ]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Counter.update does the per-key accumulation in C, so the fold is a
+    # single call per repo instead of two dict lookups per language.
+    totals = Counter()
+    for langs in results:
+        if isinstance(langs, BaseException):
+            print(f"language fetch failed: {langs}", file=sys.stderr)
+            continue
+        totals.update(langs)
+    return totals
+
+
+REPO_BUNDLE_QUERY = """
+query($login: String!, $after: String) {
+  user(login: $login) {
+    repositories(first: 100, ownerAffiliations: OWNER, isFork: false,
+                 after: $after) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        defaultBranchRef { name }
+        languages(first: 20) { edges { size node { name } } }
+      }
+    }
+  }
+}
+"""
+
+
+def fetch_user_bundle_graphql(username):
+    """Fetch the repo list and language totals in one query per 100 repos.
+
+    Collapses the 1 + N REST requests (repo pages plus one languages_url
+    per repo) into a single rate-limit point per page. Requires a token,
+    so the REST path stays around for token-less runs.
+    """
+    repos = []
+    totals = Counter()
+    after = None
+    while True:
+        for attempt in range(MAX_RETRIES):
+            try:
+                r = SESSION.post(
+                    GRAPHQL_URL,
+                    json={
+                        "query": REPO_BUNDLE_QUERY,
+                        "variables": {"login": username, "after": after},
+                    },
+                    timeout=30,
+                )
+                r.raise_for_status()
+                break
+            except requests.RequestException as e:
+                resp = getattr(e, "response", None)
+                status = resp.status_code if resp is not None else None
+                if (
+                    status is not None
+                    and 400 <= status < 500
+                    and status not in (403, 429)
+                ):
+                    raise  # permanent; backing off won't help
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                time.sleep(2 ** attempt)
+        payload = r.json()
+        if payload.get("errors"):
+            raise RuntimeError(f"GraphQL errors: {payload['errors']}")
+        connection = payload["data"]["user"]["repositories"]
+        for node in connection["nodes"]:
+            repos.append({
+                "name": node["name"],
+                "fork": False,
+                "default_branch": (node.get("defaultBranchRef") or {}).get("name"),
+            })
+            for edge in node["languages"]["edges"]:
+                totals[edge["node"]["name"]] += edge["size"]
+        if not connection["pageInfo"]["hasNextPage"]:
+            return repos, totals
+        after = connection["pageInfo"]["endCursor"]
+
+
+async def gather_stats(username):
+    """Fetch the repo list and aggregated language bytes concurrently."""
+    connector = aiohttp.TCPConnector(limit_per_host=64, limit=256)
+    async with aiohttp.ClientSession(
+        connector=connector, headers=HEADERS
+    ) as session:
+        repos = await fetch_repos(session, username)
+        totals = await aggregate_language_bytes(session, repos)
+    return repos, totals
+
+
+def download_image(url, dest):
+    """Stream *url* to *dest* (used for the avatar on the summary card)."""
+    r = SESSION.get(url, stream=True, timeout=30)
+    r.raise_for_status()
+    with open(dest, "wb") as f:
+        for chunk in r.iter_content(chunk_size=8192):
+            f.write(chunk)
+    return dest
+
+
+def iter_code_files(path):
+    """Yield paths of code files under *path* with an iterative scandir walk.
+
+    scandir exposes the entry type from the dirent, so the walk avoids a
+    stat syscall and a Path object per entry; symlinks are never followed
+    and known-heavy directories are pruned before descending.
+    """
+    stack = [str(path)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for e in entries:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        if e.name not in SKIP_DIRS:
+                            stack.append(e.path)
+                    elif e.is_file(follow_symlinks=False):
+                        if _ext_of(e.name) in CODE_EXTS:
+                            yield e.path
+                except OSError:
+                    continue
+
+
+def count_lines_in_dir(path):
+    """Count lines and files with a code extension under *path*."""
+    lines = 0
+    files = 0
+    for fp in iter_code_files(path):
+        # bytes.count stays on the C fast path; decoding to str just to
+        # count newlines would allocate the whole file a second time.
+        try:
+            size = os.stat(fp).st_size
+            if size > MAX_COUNT_BYTES:
+                continue
+            if size == 0:
+                files += 1
+                continue
+            with open(fp, "rb") as f:
+                data = f.read()
+        except OSError:
+            continue
+        n = data.count(b"\n")
+        if not data.endswith(b"\n"):
+            n += 1  # last line without trailing newline
+        lines += n
+        files += 1
+    return lines, files
+
+
+async def _fetch_blob_texts_graphql(session, owner, repo, shas):
+    """Fetch blob texts in batches of aliased object() lookups.
+
+    Returns {sha: text}; text is None for blobs GraphQL will not inline
+    whole (binary, or truncated for size), which callers fetch
+    individually over REST.
+    """
+    texts = {}
+    for i in range(0, len(shas), BLOB_BATCH):
+        chunk = shas[i:i + BLOB_BATCH]
+        fields = " ".join(
+            f'b{j}: object(oid: "{sha}") '
+            f"{{ ... on Blob {{ text isTruncated }} }}"
+            for j, sha in enumerate(chunk)
+        )
+        query = (
+            "query($owner: String!, $name: String!) {"
+            f" repository(owner: $owner, name: $name) {{ {fields} }} }}"
+        )
+        for attempt in range(MAX_RETRIES):
+            try:
+                auth, limiter = await POOL.acquire()
+                async with session.post(
+                    GRAPHQL_URL,
+                    json={
+                        "query": query,
+                        "variables": {"owner": owner, "name": repo},
+                    },
+                    headers=auth,
+                ) as resp:
+                    limiter.update(resp.headers)
+                    resp.raise_for_status()
+                    data = await resp.json()
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+        repository = (data.get("data") or {}).get("repository") or {}
+        for j, sha in enumerate(chunk):
+            node = repository.get(f"b{j}") or {}
+            # A truncated blob comes back with partial, non-null text;
+            # counting it would silently undercount, so send it to REST.
+            texts[sha] = None if node.get("isTruncated") else node.get("text")
+    return texts
+
+
+async def _count_blob_rest(session, owner, repo, sha, sem):
+    """Count newlines in a single blob fetched over REST."""
+    async with sem:
+        blob = await fetch_json(
+            session, f"{API}/repos/{owner}/{repo}/git/blobs/{sha}"
+        )
+    if blob.get("encoding") != "base64":
+        return 0
+    data = base64.b64decode(blob.get("content", ""))
+    n = data.count(b"\n")
+    if data and not data.endswith(b"\n"):
+        n += 1  # keep parity with the clone-side counters
+    return n
+
+
+async def count_repo_via_api(session, owner, repo, branch, sem):
+    """Count code lines through the trees + blobs API instead of cloning.
+
+    Only blobs whose extension is in CODE_EXTS are fetched, so repos
+    dominated by binaries/images cost a single tree listing.
+    """
+    try:
+        tree = await fetch_json(
+            session,
+            f"{API}/repos/{owner}/{repo}/git/trees/{branch}",
+            params={"recursive": "1"},
+        )
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"tree fetch failed for {owner}/{repo}: {e}", file=sys.stderr)
+        return 0, 0
+    if tree.get("truncated"):
+        print(f"tree listing truncated for {owner}/{repo}", file=sys.stderr)
+    shas = [
+        e["sha"] for e in tree.get("tree", [])
+        if e["type"] == "blob"
+        and _ext_of(e["path"]) in CODE_EXTS
+        # Same vendored-blob cap as the clone-side counters, applied
+        # before any bytes are transferred.
+        and e.get("size", 0) <= MAX_COUNT_BYTES
+    ]
+    if not shas:
+        return 0, 0
+
+    texts = await _fetch_blob_texts_graphql(session, owner, repo, shas)
+    lines = 0
+    files = 0
+    rest = []
+    for sha in shas:
+        text = texts.get(sha)
+        if text is None:
+            rest.append(sha)
+            continue
+        n = text.count("\n")
+        if text and not text.endswith("\n"):
+            n += 1  # keep parity with the clone-side counters
+        lines += n
+        files += 1
+    counts = await asyncio.gather(
+        *(_count_blob_rest(session, owner, repo, sha, sem) for sha in rest),
+        return_exceptions=True,
+    )
+    for n in counts:
+        if isinstance(n, BaseException):
+            print(f"blob fetch failed in {owner}/{repo}: {n}", file=sys.stderr)
+            continue
+        lines += n
+        files += 1
+    return lines, files
+
+
+async def count_all_lines(repos):
+    """Fan out per-repo API counting; returns (total_lines, total_files)."""
+    connector = aiohttp.TCPConnector(limit_per_host=64, limit=256)
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    async with aiohttp.ClientSession(
+        connector=connector, headers=HEADERS
+    ) as session:
+        results = await asyncio.gather(
+            *(
+                count_repo_via_api(
+                    session, USERNAME, r["name"],
+                    r.get("default_branch") or "main", sem,
+                )
+                for r in repos
+            ),
+            return_exceptions=True,
+        )
+    total_lines = 0
+    total_files = 0
+    for res in results:
+        if isinstance(res, BaseException):
+            print(f"api count failed: {res}", file=sys.stderr)
+            continue
+        total_lines += res[0]
+        total_files += res[1]
+    return total_lines, total_files
+
+
+def _count_blobs_via_git(repo_dir):
+    """Count code lines straight from the object database of *repo_dir*.
+
+    ls-tree supplies the blob list, extension filtering happens in
+    Python, and one cat-file --batch process streams only the matching
+    blobs — non-code content is never materialized on disk.
+    """
+    # -z terminates entries with NUL and disables the C-style quoting
+    # git otherwise applies to non-ASCII paths, which would break the
+    # extension filter.
+    ls = subprocess.run(
+        ["git", "-C", repo_dir, "ls-tree", "-r", "-z", "HEAD"],
+        capture_output=True, text=True, check=True,
+    )
+    shas = []
+    for entry in ls.stdout.split("\0"):
+        if not entry:
+            continue
+        _mode, typ, rest = entry.split(None, 2)
+        if typ != "blob":
+            continue
+        sha, _, path = rest.partition("\t")
+        if _ext_of(path) in CODE_EXTS:
+            shas.append(sha)
+    if not shas:
+        return 0, 0
+
+    cf = subprocess.run(
+        ["git", "-C", repo_dir, "cat-file", "--batch"],
+        input="\n".join(shas).encode() + b"\n",
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True,
+    )
+    buf = cf.stdout
+    lines = 0
+    files = 0
+    pos = 0
+    for _ in range(len(shas)):
+        nl = buf.find(b"\n", pos)
+        if nl < 0:
+            break
+        header = buf[pos:nl].split()
+        pos = nl + 1
+        if len(header) != 3 or header[1] != b"blob":
+            continue  # "<sha> missing" carries no body
+        size = int(header[2])
+        body = buf[pos:pos + size]
+        pos += size + 1  # skip the LF terminating each object
+        if size > MAX_COUNT_BYTES:
+            continue
+        n = body.count(b"\n")
+        if body and not body.endswith(b"\n"):
+            n += 1
+        lines += n
+        files += 1
+    return lines, files
+
+
+def _git_clone(url, dest, branch, extra=()):
+    """Shallow-clone via plain git; GitPython's object graph costs real
+    startup time per clone and buys nothing for a throwaway checkout."""
+    subprocess.run(
+        [
+            "git", "clone", "--depth=1", "-q",
+            "--config=core.autocrlf=false", "--config=core.fsmonitor=false",
+            *extra, "--branch", branch, url, dest,
+        ],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+
+
+def clone_and_count(clone_url, branch):
+    """Count a repo's code lines from a checkout-less partial clone.
+
+    --filter=blob:none --no-checkout skips both the blob transfer and
+    the working-tree write; cat-file then faults in only the code blobs.
+    Falls back to a plain shallow clone plus the directory walk when the
+    remote or local git cannot do partial clones.
+    """
+    with tempfile.TemporaryDirectory(prefix="stats-") as tmp:
+        odb = os.path.join(tmp, "odb")
+        try:
+            _git_clone(
+                clone_url, odb, branch, ("--filter=blob:none", "--no-checkout")
+            )
+            return _count_blobs_via_git(odb)
+        except (subprocess.CalledProcessError, ValueError) as e:
+            print(f"odb count failed for {clone_url}: {e}", file=sys.stderr)
+        full = os.path.join(tmp, "full")
+        try:
+            _git_clone(clone_url, full, branch)
+        except subprocess.CalledProcessError as e:
+            print(f"clone failed for {clone_url}: {e}", file=sys.stderr)
+            return 0, 0
+        return count_lines_in_dir(full)
+
+
+def _rasterize(svg_path, png_path):
+    """Rasterize an already-saved SVG to PNG.
+
+    Running the matplotlib draw pipeline once and converting the SVG is
+    cheaper than a second savefig through the Agg backend.
+    """
+    cairosvg.svg2png(url=str(svg_path), write_to=str(png_path),
+                     output_width=1200)
+
+
+# cairo and libpng do their work outside the GIL, so rasterizing on a
+# thread overlaps with the next figure's matplotlib draw.
+_RENDER_POOL = ThreadPoolExecutor(max_workers=2)
+_RENDER_JOBS = []
+
+
+def _rasterize_async(svg_path, png_path, sidecar, digest):
+    """Queue rasterization + sidecar write without blocking the caller."""
+    def job():
+        _rasterize(svg_path, png_path)
+        Path(sidecar).write_text(digest, encoding="utf-8")
+    _RENDER_JOBS.append(_RENDER_POOL.submit(job))
+
+
+def flush_renders():
+    """Wait for queued rasterizations, surfacing the first failure."""
+    for fut in _RENDER_JOBS:
+        fut.result()
+    _RENDER_JOBS.clear()
+
+
+def _render_unchanged(sidecar, digest, *outputs):
+    """True when the sidecar digest matches and every output still exists."""
+    try:
+        if Path(sidecar).read_text(encoding="utf-8").strip() != digest:
+            return False
+    except OSError:
+        return False
+    return all(Path(o).exists() for o in outputs)
+
+
+def _input_digest(payload):
+    return hashlib.blake2b(
+        json.dumps(payload, sort_keys=True).encode()
+    ).hexdigest()
+
+
+def make_bar_chart_top_languages(lang_totals, out_png, out_svg, top=8):
+    """Render a horizontal bar chart of the top languages by bytes."""
+    items = sorted(lang_totals.items(), key=lambda kv: kv[1], reverse=True)[:top]
+
+    # The chart only depends on the top-language slice; skip the whole
+    # matplotlib pipeline when nothing changed since the last run.
+    sidecar = f"{out_png}.sha"
+    digest = _input_digest([USERNAME, items])
+    if _render_unchanged(sidecar, digest, out_png, out_svg):
+        return
+    names = [k for k, _ in items][::-1]
+    sizes = [v for _, v in items][::-1]
+
+    fig, ax = plt.subplots(figsize=(8, 4.5))
+    ax.barh(names, sizes, color="tab:blue")
+    ax.set_xlabel("bytes")
+    ax.set_title(f"Top languages — {USERNAME}")
+    # bbox_inches="tight" on save already crops; tight_layout would just
+    # run the expensive layout solver a second time.
+    fig.savefig(out_svg, format="svg", bbox_inches="tight")
+    plt.close(fig)
+    _rasterize_async(out_svg, out_png, sidecar, digest)
+
+
+CARD_TMPL = """\
+<svg xmlns="http://www.w3.org/2000/svg" width="800" height="200" \
+viewBox="0 0 800 200">
+  <style>
+    .name {{ font: bold 22px sans-serif; fill: #24292f; }}
+    .stat {{ font: 15px monospace; fill: #57606a; }}
+  </style>
+  <rect width="799" height="199" x="0.5" y="0.5" rx="10"
+        fill="#f6f8fa" stroke="#d0d7de"/>
+  <text class="name" x="24" y="52">{name}</text>
+  <text class="stat" x="24" y="96">Public repos: {repos}   \
+Followers: {followers}</text>
+  <text class="stat" x="24" y="128">Languages: {languages}</text>
+  <text class="stat" x="24" y="160">Lines of code: {lines} in {files} \
+files</text>
+  {avatar}
+</svg>
+"""
+
+AVATAR_TMPL = (
+    '<image x="630" y="36" width="128" height="128" '
+    'href="data:{mime};base64,{b64}"/>'
+)
+
+
+def _avatar_fragment(avatar_path):
+    """Inline the avatar as a data URI, or return '' when unavailable."""
+    try:
+        raw = Path(avatar_path).read_bytes()
+    except OSError:
+        return ""
+    mime = "image/jpeg" if raw[:2] == b"\xff\xd8" else "image/png"
+    return AVATAR_TMPL.format(
+        mime=mime, b64=base64.b64encode(raw).decode("ascii")
+    )
+
+
+def make_summary_card(user, lang_totals, total_lines, total_files,
+                      out_png, out_svg, avatar_path=None):
+    """Write the summary card from a static SVG template.
+
+    The card is one box of text, so string formatting replaces the
+    whole matplotlib pipeline here; the PNG is still rasterized from
+    the SVG on the render pool.
+    """
+    sidecar = f"{out_png}.sha"
+    digest = _input_digest([
+        user.get("name"), user["login"], user["public_repos"],
+        user["followers"], len(lang_totals), total_lines, total_files,
+    ])
+    if _render_unchanged(sidecar, digest, out_png, out_svg):
+        return
+
+    svg = CARD_TMPL.format(
+        name=html.escape(user.get("name") or user["login"]),
+        repos=user["public_repos"],
+        followers=user["followers"],
+        languages=len(lang_totals),
+        lines=f"{total_lines:,}",
+        files=f"{total_files:,}",
+        avatar=_avatar_fragment(avatar_path) if avatar_path else "",
+    )
+    Path(out_svg).write_text(svg, encoding="utf-8")
+    _rasterize_async(out_svg, out_png, sidecar, digest)
+
+
+def render_section(total_lines, total_files):
+    """Render the marker-delimited stats section for the README."""
+    stamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    return (
+        f"{STATS_START}\n"
+        f"![Top languages]({LANGS_SVG.name})\n\n"
+        f"![Summary]({CARD_SVG.name})\n\n"
+        f"<sub>{total_lines:,} lines across {total_files:,} files — "
+        f"updated {stamp}</sub>\n"
+        f"{STATS_END}"
+    )
+
+
+def update_readme_with_images(readme_path, total_lines, total_files):
+    """Replace the section between the STATS markers in the README.
+
+    A single compiled-regex substitution scans the README once; when no
+    marker block exists yet, the section is appended instead. When the
+    substantive numbers are unchanged since the last run, the rewrite is
+    skipped entirely so the timestamp alone never triggers a commit and
+    push (and the CI run behind it).
+    """
+    content = Path(readme_path).read_text(encoding="utf-8")
+    digest = _input_digest([total_lines, total_files])
+    if _CACHE.get("readme_hash") == digest and STATS_RE.search(content):
+        return False
+    section = render_section(total_lines, total_files)
+    new_content, n = STATS_RE.subn(lambda _m: section, content, count=1)
+    if n == 0:
+        new_content = content.rstrip() + f"\n\n# Code Stats 📊\n{section}\n"
+    Path(readme_path).write_text(new_content, encoding="utf-8")
+    _CACHE["readme_hash"] = digest
+    return True
+
+
+def commit_and_push(repo_path, message):
+    """Commit the regenerated README + images and push."""
+    repo = Repo(repo_path)
+    repo.index.add([
+        README_PATH.name,
+        LANGS_PNG.name, LANGS_SVG.name, CARD_PNG.name, CARD_SVG.name,
+        f"{LANGS_PNG.name}.sha", f"{CARD_PNG.name}.sha",
+    ])
+    if not repo.index.diff("HEAD"):
+        print("nothing to commit")
+        return False
+    repo.index.commit(message)
+    repo.remote("origin").push()
+    return True
+
+
+if __name__ == "__main__":
+    user = fetch_user_info(USERNAME)
+    if TOKEN:
+        repos, lang_totals = fetch_user_bundle_graphql(USERNAME)
+    else:
+        repos, lang_totals = asyncio.run(gather_stats(USERNAME))
+    nonfork_repos = [r for r in repos if not r.get("fork")]
+
+    if TOKEN:
+        total_lines, total_files = asyncio.run(count_all_lines(nonfork_repos))
+    else:
+        # The unauthenticated limit (60 req/hr) cannot cover a per-blob
+        # fan-out, so without a token fall back to shallow clones. The
+        # clones are network+disk bound, so overlap them across workers.
+        total_lines = 0
+        total_files = 0
+        workers = max(1, min(8, os.cpu_count() or 1, len(nonfork_repos)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    clone_and_count,
+                    r["clone_url"],
+                    r.get("default_branch") or "main",
+                )
+                for r in nonfork_repos
+            ]
+            for fut in as_completed(futures):
+                lines, files = fut.result()
+                total_lines += lines
+                total_files += files
+
+    make_bar_chart_top_languages(lang_totals, LANGS_PNG, LANGS_SVG)
+    with tempfile.TemporaryDirectory(prefix="stats-") as tmp:
+        avatar = None
+        try:
+            avatar = download_image(
+                user["avatar_url"], os.path.join(tmp, "avatar.png")
+            )
+        except requests.RequestException as e:
+            print(f"avatar fetch failed: {e}", file=sys.stderr)
+        make_summary_card(
+            user, lang_totals, total_lines, total_files, CARD_PNG, CARD_SVG,
+            avatar_path=avatar,
+        )
+
+    flush_renders()
+    update_readme_with_images(README_PATH, total_lines, total_files)
+    _flush_cache()
+
+    if "--push" in sys.argv:
+        commit_and_push(README_PATH.parent, "chore: update stats")